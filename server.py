@@ -1,45 +1,94 @@
+import asyncio
+import atexit
 import os
+import re
 import sys
-from datetime import datetime
+import threading
+import time
+from datetime import date
 from typing import Any
 
 import httpx
+import orjson
 from dotenv import load_dotenv
 
 from mcp.server.fastmcp import FastMCP
 
+from server_resources import ResourceType, Speech, create_resource, parse_protocol
+
 load_dotenv()
 
 mcp = FastMCP("Bundetag")
 
+# Compiled once; used to decide whether a search keyword is a plain word.
+_WORD = re.compile(r"\w+")
+
+# Frequent keywords would otherwise produce megabytes of snippets; cap the
+# response so serialization and transfer stay bounded.
+_MAX_MATCHES_PER_SPEECH = 20
+_MAX_SEARCH_RESULTS = 200
+
+# One client for the whole process so connections to search.dip.bundestag.de
+# are kept alive and reused instead of doing a TCP+TLS handshake per call.
+_API_KEY = os.getenv("BUNDESTAG_API_KEY")
+_DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    # The API serves XML/JSON that compresses ~10x; httpx decompresses
+    # transparently (brotli comes from the extra dependency).
+    "Accept-Encoding": "gzip, br",
+    "Authorization": f"ApiKey {_API_KEY}"
+}
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    headers=_DEFAULT_HEADERS
+)
+
+def _close_client():
+    try:
+        asyncio.run(_CLIENT.aclose())
+    except Exception:
+        pass
+
+atexit.register(_close_client)
+
 async def query_api(url: str, query_params) -> dict[str, Any] | None:
-    headers = {
-        "Accept": "application/json",
-        "Authorization": f"ApiKey {os.getenv('BUNDESTAG_API_KEY')}"
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0, params=query_params)
-            response.raise_for_status()
-            if query_params["format"] == "json":
-                return response.json()
-            else: 
-                return response.content
-        except Exception:
-            return None
-        
+    try:
+        response = await _CLIENT.get(url, params=query_params)
+        response.raise_for_status()
+        if query_params["format"] == "json":
+            return response.json()
+        else:
+            return response.content
+    except Exception:
+        return None
+
+
+# The discovered XML URL is stable for a given session day, so cache it
+# for an hour and skip the whole documents-listing round-trip on warm calls.
+_url_cache = None
+_url_cache_day = None
+_url_cache_time = 0.0
+_URL_CACHE_TTL = 3600.0
 
 async def get_last_protocol_xml_url():
+    global _url_cache, _url_cache_day, _url_cache_time
+    today = date.today().isoformat()
+    if (_url_cache and _url_cache_day == today
+            and time.monotonic() - _url_cache_time < _URL_CACHE_TTL):
+        return _url_cache
+
     url = "https://search.dip.bundestag.de/api/v1/plenarprotokoll"
     params = {
         "f.datum.start": "2025-01-01",
-        "f.datum.end": datetime.now().strftime("%Y-%m-%d"),
+        "f.datum.end": today,
         "format": "json",
         "f.zuordnung": "BT"
     }
-    
+
     results = await query_api(url, params)
-    
+
     xml_url = None
     if results:
         if "documents" in results:
@@ -51,9 +100,146 @@ async def get_last_protocol_xml_url():
                     print(f"Using protocol from {doc["fundstelle"]["datum"]}", file=sys.stderr)
                     xml_url = doc["fundstelle"]["xml_url"]
                     break
-            
+
+    if xml_url:
+        _url_cache = xml_url
+        _url_cache_day = today
+        _url_cache_time = time.monotonic()
+
     return xml_url
 
+async def stream_protocol_xml():
+    """Yield the latest protocol XML in 64 KiB chunks.
+
+    Streaming keeps peak memory at one chunk and lets consumers start on
+    the first chunk instead of waiting for the full multi-MB download.
+    """
+    xml_url = await get_last_protocol_xml_url()
+    if not xml_url:
+        return
+    async with _CLIENT.stream("GET", xml_url, params={"format": "xml"}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(64 * 1024):
+            yield chunk
+
+# The protocol XML is fetched once per process. Concurrent callers share a
+# single in-flight fetch (single-flight pattern) instead of each triggering
+# their own multi-MB download before the cache is warm.
+_protocol_future: asyncio.Future | None = None
+_protocol_lock = asyncio.Lock()
+
+async def get_protocol_xml():
+    global _protocol_future
+    async with _protocol_lock:
+        if _protocol_future is None:
+            _protocol_future = asyncio.get_running_loop().create_future()
+            fetch = True
+        else:
+            fetch = False
+        future = _protocol_future
+
+    if fetch:
+        # The cached copy needs the whole document, but fetching through
+        # the streaming path keeps only chunk-sized buffers while the
+        # download is in flight.
+        protocol_xml = None
+        try:
+            chunks = []
+            try:
+                async for chunk in stream_protocol_xml():
+                    chunks.append(chunk)
+            except Exception:
+                chunks = []
+            protocol_xml = b"".join(chunks) if chunks else None
+            if protocol_xml is not None:
+                # Build the common resource views in the background so
+                # follow-up requests find them already cached.
+                global _warm_task
+                _warm_task = asyncio.create_task(_warm_resource_cache(protocol_xml))
+                _warm_task.add_done_callback(_log_warm_failure)
+        finally:
+            # Resolve the future no matter how the fetch ends --
+            # CancelledError bypasses the except above, and a future that
+            # is never resolved would strand every later caller on a
+            # flight that will never land. Failed fetches are not cached;
+            # the next caller starts a fresh one. No await here: the lock
+            # is off-limits inside a cancelled task, and plain assignment
+            # is safe on the single event-loop thread.
+            if protocol_xml is None and _protocol_future is future:
+                _protocol_future = None
+            if not future.done():
+                future.set_result(protocol_xml)
+
+    return await future
+
+# The parsed tree is cached alongside the raw bytes so every resource view
+# reuses one parse instead of re-parsing the full document per request.
+# The lock matters because the warm-up builds run on worker threads in
+# parallel: without it each of them races past the None check and parses
+# (and then pins) its own full DOM.
+_cached_tree = None
+_cached_tree_source = None
+_tree_lock = threading.Lock()
+
+def _get_cached_tree(protocol_xml):
+    global _cached_tree, _cached_tree_source
+    if protocol_xml is None:
+        return None
+    with _tree_lock:
+        if _cached_tree is None or _cached_tree_source is not protocol_xml:
+            _cached_tree = parse_protocol(protocol_xml)
+            _cached_tree_source = protocol_xml
+        return _cached_tree
+
+def _build_resource(resource_type, protocol_xml):
+    return create_resource(resource_type, protocol_xml, tree=_get_cached_tree(protocol_xml))
+
+# Built resource views, cached per process. Warmed in the background right
+# after the protocol arrives so the first client requests hit memory.
+_resource_cache: dict[ResourceType, Any] = {}
+_warm_task = None
+
+async def _get_resource(resource_type, protocol_xml):
+    if protocol_xml is None:
+        # Upstream fetch failed; degrade like query_api does instead of
+        # letting the parser raise on None.
+        return None
+    resource = _resource_cache.get(resource_type)
+    if resource is None:
+        resource = await asyncio.to_thread(_build_resource, resource_type, protocol_xml)
+        _resource_cache[resource_type] = resource
+    return resource
+
+async def _resource_json(resource_type) -> str:
+    """Fetch the protocol and serve one resource view as JSON."""
+    protocol_xml = await get_protocol_xml()
+    resource = await _get_resource(resource_type, protocol_xml)
+    if resource is None:
+        return "{}"
+    # Serialize off the loop: FullProtocol's sections are lazy, so its
+    # first to_json() runs the whole extraction, and even the smaller
+    # views serialize megabytes on a warm cache miss.
+    return await asyncio.to_thread(resource.to_json)
+
+def _log_warm_failure(task):
+    # The warm task is fire-and-forget; without this callback a failure
+    # only shows up as an unretrieved-exception warning at GC time.
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Resource cache warm-up failed: {task.exception()!r}", file=sys.stderr)
+
+async def _warm_resource_cache(protocol_xml):
+    # Parse once up front so the six parallel builds all find the shared
+    # tree instead of contending on the parse lock.
+    await asyncio.to_thread(_get_cached_tree, protocol_xml)
+    async with asyncio.TaskGroup() as tg:
+        for resource_type in (ResourceType.SESSION_METADATA,
+                              ResourceType.TABLE_OF_CONTENTS,
+                              ResourceType.AGENDA_ITEM,
+                              ResourceType.SPEAKER_LIST,
+                              ResourceType.ATTACHMENT_LIST,
+                              ResourceType.SPEECH):
+            tg.create_task(_get_resource(resource_type, protocol_xml))
+
 #
 # MCP Tool Definition
 #
@@ -63,11 +249,118 @@ async def get_last_bundestagsprotocol() -> str:
     """Get the protocol of the last German parliament session.
     Das Protokoll der letzten Plenarsitzung des Deutschen Bundestags.
     """
-    
-    xml_url = await get_last_protocol_xml_url()
-    last_protocol_xml = await query_api(xml_url, {"format": "xml"})
 
-    return last_protocol_xml
+    return await get_protocol_xml()
+
+#
+# MCP Resource Definitions
+#
+
+@mcp.resource("plenarprotokoll://full", mime_type="application/json")
+async def plenarprotokoll_full() -> str:
+    """The full protocol of the last session as structured JSON."""
+    return await _resource_json(ResourceType.FULL_PROTOCOL)
+
+@mcp.resource("plenarprotokoll://metadata", mime_type="application/json")
+async def plenarprotokoll_metadata() -> str:
+    """Metadata of the last session: legislative period, number, date."""
+    return await _resource_json(ResourceType.SESSION_METADATA)
+
+@mcp.resource("plenarprotokoll://toc", mime_type="application/json")
+async def plenarprotokoll_toc() -> str:
+    """The table of contents of the last session."""
+    return await _resource_json(ResourceType.TABLE_OF_CONTENTS)
+
+@mcp.resource("plenarprotokoll://agenda", mime_type="application/json")
+async def plenarprotokoll_agenda() -> str:
+    """The agenda items (Tagesordnungspunkte) of the last session."""
+    return await _resource_json(ResourceType.AGENDA_ITEM)
+
+@mcp.resource("plenarprotokoll://speakers", mime_type="application/json")
+async def plenarprotokoll_speakers() -> str:
+    """All speakers (Redner) of the last session."""
+    return await _resource_json(ResourceType.SPEAKER_LIST)
+
+@mcp.resource("plenarprotokoll://attachments", mime_type="application/json")
+async def plenarprotokoll_attachments() -> str:
+    """The attachments (Anlagen) of the last session."""
+    return await _resource_json(ResourceType.ATTACHMENT_LIST)
+
+@mcp.resource("plenarprotokoll://speeches", mime_type="application/json")
+async def plenarprotokoll_speeches() -> str:
+    """All speeches (Reden) of the last session."""
+    return await _resource_json(ResourceType.SPEECH)
+
+@mcp.resource("plenarprotokoll://speaker/{speaker_id}", mime_type="application/json")
+async def plenarprotokoll_speaker_speeches(speaker_id: str) -> str:
+    """All speeches of a specific speaker, by speaker id."""
+    protocol_xml = await get_protocol_xml()
+    speech_resource = await _get_resource(ResourceType.SPEECH, protocol_xml)
+    if speech_resource is None:
+        return Speech.from_list([]).to_json()
+    return Speech.from_list(speech_resource._by_speaker.get(speaker_id, [])).to_json()
+
+@mcp.resource("plenarprotokoll://fraction/{fraction}", mime_type="application/json")
+async def plenarprotokoll_fraction_speeches(fraction: str) -> str:
+    """All speeches of a specific fraction (Fraktion)."""
+    protocol_xml = await get_protocol_xml()
+    speech_resource = await _get_resource(ResourceType.SPEECH, protocol_xml)
+    if speech_resource is None:
+        return Speech.from_list([]).to_json()
+    return Speech.from_list(speech_resource._by_fraction.get(fraction, [])).to_json()
+
+@mcp.resource("plenarprotokoll://search/{keyword}", mime_type="application/json")
+async def plenarprotokoll_search(keyword: str) -> str:
+    """Search all speeches for a keyword and return matching snippets."""
+    protocol_xml = await get_protocol_xml()
+    speech_resource = await _get_resource(ResourceType.SPEECH, protocol_xml)
+    if speech_resource is None:
+        return orjson.dumps({"suchergebnisse": []}).decode()
+    keyword_lower = keyword.lower()
+    speeches = speech_resource.speeches
+    # Single-word keywords resolve through the inverted index; anything
+    # with non-word characters falls back to scanning every speech. An
+    # index *miss* also falls back: the index only knows whole tokens, so
+    # "klima" would otherwise miss speeches that only contain compounds
+    # like "Klimaschutz". (A token hit still skips compound-only matches
+    # in other speeches -- the index path keeps whole-token semantics,
+    # the scan path substring semantics.)
+    candidates = None
+    if _WORD.fullmatch(keyword_lower):
+        indexed = speech_resource.token_index().get(keyword_lower)
+        if indexed:
+            candidates = sorted(indexed)
+    if candidates is None:
+        candidates = range(len(speeches))
+    search_results = []
+    for i in candidates:
+        speech = speeches[i]
+        content = speech_resource.lower_contents[i]
+        # A literal substring needs no regex engine: str.find is a plain
+        # C-level scan.
+        matches = []
+        idx = 0
+        last_end = -1
+        while (pos := content.find(keyword_lower, idx)) != -1:
+            if len(matches) >= _MAX_MATCHES_PER_SPEECH:
+                break
+            start = max(0, pos - 100)
+            end = min(len(content), pos + len(keyword_lower) + 100)
+            # Hits inside the previous snippet's window would only repeat
+            # the same text.
+            if start >= last_end:
+                matches.append(f"...{speech['inhalt'][start:end]}...")
+                last_end = end
+            idx = pos + 1
+        if matches:
+            search_results.append({
+                "id": speech["id"],
+                "redner": speech["redner"],
+                "matches": matches,
+            })
+            if len(search_results) >= _MAX_SEARCH_RESULTS:
+                break
+    return orjson.dumps({"suchergebnisse": search_results}).decode()
 
 if __name__ == "__main__":
     print("Starting Bundestag-MCP", file=sys.stderr)
@@ -0,0 +1,621 @@
+import json
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+
+from lxml import etree as ET
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Compiled once at import so the hot extraction and search paths don't pay
+# for pattern lookup per call.
+_WHITESPACE = re.compile(r"\s+")
+_NON_WORD = re.compile(r"\W+")
+
+# One tuned parser for every parse in the process: no xml:id index (we
+# never look ids up through the parser), no entity resolution or error
+# recovery for the read-only extraction, and no size limits since plenary
+# protocols can be very large.
+_PARSER = ET.XMLParser(huge_tree=True, collect_ids=False,
+                       resolve_entities=False, recover=False)
+
+def parse_protocol(xml_data):
+    """Parse raw protocol XML with the shared tuned parser."""
+    return ET.fromstring(xml_data, _PARSER)
+
+# XPath expressions compiled once; findall/find re-parse the path string on
+# every call, which adds up when the same expression runs per block or rede.
+# (A root-bound XPathEvaluator would fit a fixed-tree/varying-expression
+# workload; ours is the opposite - a fixed expression set applied to a new
+# tree per protocol - which is exactly what compiled XPath objects are for.)
+_XP_IVZ_BLOCK = ET.XPath(".//ivz-block")
+# Titles and entry contents are direct children; the child axis saves a
+# full-subtree walk per block/eintrag. ivz-block itself stays on the
+# descendant axis since the inhaltsverzeichnis wrapper depth varies.
+_XP_IVZ_BLOCK_TITEL = ET.XPath("./ivz-block-titel")
+_XP_IVZ_EINTRAG = ET.XPath("./ivz-eintrag")
+_XP_IVZ_EINTRAG_INHALT = ET.XPath("./ivz-eintrag-inhalt")
+_XP_TOP = ET.XPath(".//tagesordnungspunkt")
+_XP_REDNER = ET.XPath(".//redner")
+_XP_REDE = ET.XPath(".//rede")
+_XP_REDE_REDNER = ET.XPath("./p[@klasse='redner']/redner")
+# Filtering inside libxml2 skips the Python-level branch per block.
+_XP_ANLAGEN = ET.XPath(".//ivz-block[starts-with(ivz-block-titel, 'Anlage')]")
+
+def _first(nodes):
+    return nodes[0] if nodes else None
+
+def _t(elem):
+    """Stripped text of an element, or "" if the element or text is missing."""
+    return elem.text.strip() if elem is not None and elem.text else ""
+
+# The speaker record's field list is fixed, so the builder is generated
+# once at import with the field loop unrolled into locals: no per-speaker
+# dict-of-children plumbing, just one child walk and direct assignments.
+_SPEAKER_FIELDS = ("vorname", "nachname", "titel", "fraktion")
+
+def _compile_speaker_builder(fields=_SPEAKER_FIELDS):
+    src = ["def _build_speaker(redner_id, name_elem):"]
+    src.append("    " + " = ".join(fields + ("rolle",)) + " = None")
+    src.append("    for child in name_elem:")
+    src.append("        tag = child.tag")
+    branch = "if"
+    for field in fields + ("rolle",):
+        src.append(f"        {branch} tag == '{field}':")
+        src.append(f"            {field} = child")
+        branch = "elif"
+    src.append("    rolle_lang = rolle.find('./rolle_lang') if rolle is not None else None")
+    items = ", ".join(["'id': redner_id"]
+                      + [f"'{field}': _t({field})" for field in fields]
+                      + ["'rolle': _t(rolle_lang)"])
+    src.append("    return {" + items + "}")
+    namespace = {"_t": _t}
+    exec("\n".join(src), namespace)
+    return namespace["_build_speaker"]
+
+_build_speaker = _compile_speaker_builder()
+
+# Compiled once at import: the speech transform runs the whole-tree
+# traversal inside libxslt instead of the Python loop.
+_SPEECH_XSLT = ET.XSLT(ET.parse(str(Path(__file__).with_name("speeches.xslt"))))
+
+# lxml drops the GIL during C-level XPath and iteration, so FullProtocol's
+# independent section extractors genuinely run in parallel on this pool.
+_EXTRACTOR_POOL = ThreadPoolExecutor(max_workers=5)
+
+
+class ResourceType(Enum):
+    FULL_PROTOCOL = "full_protocol"
+    SESSION_METADATA = "session_metadata"
+    TABLE_OF_CONTENTS = "table_of_contents"
+    AGENDA_ITEM = "agenda_item"
+    SPEAKER_LIST = "speaker_list"
+    ATTACHMENT_LIST = "attachment_list"
+    SPEECH = "speech"
+
+
+class BundestagResource:
+    """Base class for the different views on a plenary protocol XML."""
+
+    def __init__(self, xml_data, tree=None):
+        # A pre-parsed tree (shared by the server-side cache) skips the
+        # expensive re-parse of the full document.
+        self.root = tree if tree is not None else ET.fromstring(xml_data, _PARSER)
+        self._source_bytes = xml_data
+        self._parse_metadata()
+
+    def source_bytes(self) -> bytes:
+        """The raw XML this resource was built from.
+
+        Returns the original input when available; otherwise the tree is
+        serialized once and the result kept, so no caller pays for
+        repeated ET.tostring round trips.
+        """
+        if self._source_bytes is None:
+            self._source_bytes = ET.tostring(self.root)
+        return self._source_bytes
+
+    @classmethod
+    def _from_root(cls, root):
+        """Build the resource view around an already-parsed tree."""
+        obj = cls.__new__(cls)
+        obj.root = root
+        obj._source_bytes = None
+        obj._parse_metadata()
+        return obj
+
+    # Tags a view consumes from a streaming parse, and the subset whose
+    # subtrees may be freed once handled (None = free every handled tag).
+    _STREAM_TAGS = ()
+    _STREAM_CLEAR_TAGS = None
+
+    @classmethod
+    def from_stream(cls, fileobj):
+        """Build the resource view from a file-like object in one
+        streaming pass.
+
+        Handled subtrees are cleared as they close, so peak memory stays
+        bounded by one subtree instead of the whole document.
+        """
+        obj = cls.__new__(cls)
+        obj.root = None
+        obj._source_bytes = None
+        obj._stream_init()
+        clear_tags = cls._STREAM_CLEAR_TAGS
+        for _, elem in ET.iterparse(fileobj, events=("end",), tag=cls._STREAM_TAGS):
+            obj._stream_handle(elem)
+            if clear_tags is None or elem.tag in clear_tags:
+                elem.clear()
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+        obj._stream_finish()
+        return obj
+
+    def _stream_init(self):
+        pass
+
+    def _stream_handle(self, elem):
+        pass
+
+    def _stream_finish(self):
+        pass
+
+    def _parse_metadata(self):
+        pass
+
+    def to_dict(self):
+        return {}
+
+    def to_json_bytes(self) -> bytes:
+        # orjson serializes at C speed; no indentation since the output is
+        # consumed by machines, not read by humans. stdlib json keeps the
+        # same output contract if orjson is missing.
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode()
+
+    def to_json(self):
+        # FastMCP enforces str for text resources; callers that can handle
+        # bytes should use to_json_bytes() and skip this decode.
+        return self.to_json_bytes().decode()
+
+
+class SessionMetadata(BundestagResource):
+    """Basic facts about the session: legislative period, number, date."""
+
+    def _read_attrs(self, elem):
+        self.wahlperiode = elem.get("wahlperiode", "")
+        self.sitzung_nr = elem.get("sitzung-nr", "")
+        self.datum = elem.get("sitzung-datum", "")
+        self.start_uhrzeit = elem.get("sitzung-start-uhrzeit", "")
+        self.ende_uhrzeit = elem.get("sitzung-ende-uhrzeit", "")
+        self.ort = elem.get("sitzung-ort", "")
+
+    def _parse_metadata(self):
+        self._read_attrs(self.root)
+
+    _STREAM_TAGS = ("dbtplenarprotokoll",)
+
+    def _stream_handle(self, elem):
+        self._read_attrs(elem)
+
+    def to_dict(self):
+        return {
+            "wahlperiode": self.wahlperiode,
+            "sitzung_nr": self.sitzung_nr,
+            "datum": self.datum,
+            "start_uhrzeit": self.start_uhrzeit,
+            "ende_uhrzeit": self.ende_uhrzeit,
+            "ort": self.ort,
+        }
+
+
+class TableOfContents(BundestagResource):
+    """The table of contents (Inhaltsverzeichnis) of the protocol."""
+
+    def _parse_metadata(self):
+        self.entries = self._extract_toc()
+
+    @staticmethod
+    def _block_entry(block):
+        titel = _t(_first(_XP_IVZ_BLOCK_TITEL(block)))
+        items = []
+        for eintrag in _XP_IVZ_EINTRAG(block):
+            inhalt_elem = _first(_XP_IVZ_EINTRAG_INHALT(eintrag))
+            if inhalt_elem is not None and inhalt_elem.text:
+                items.append(inhalt_elem.text.strip())
+        return {"titel": titel, "eintraege": items}
+
+    def _extract_toc(self):
+        return [self._block_entry(block) for block in _XP_IVZ_BLOCK(self.root)]
+
+    _STREAM_TAGS = ("ivz-block",)
+
+    def _stream_init(self):
+        self.entries = []
+
+    def _stream_handle(self, elem):
+        self.entries.append(self._block_entry(elem))
+
+    def to_dict(self):
+        return {"inhaltsverzeichnis": self.entries}
+
+
+class AgendaItem(BundestagResource):
+    """The agenda items (Tagesordnungspunkte) of the session."""
+
+    def _parse_metadata(self):
+        self.agenda_items = self._extract_agenda_items()
+
+    @staticmethod
+    def _agenda_entry(top):
+        # One C-level iter() walk per TOP: the first T_fett paragraph is
+        # the title, everything else joins the description.
+        titel = ""
+        titel_seen = False
+        description = []
+        for p in top.iter("p"):
+            if not titel_seen and p.get("klasse") == "T_fett":
+                titel_seen = True
+                if p.text:
+                    titel = p.text.strip()
+                continue
+            if p.text:
+                description.append(p.text.strip())
+        return {
+            "top_id": top.get("top-id", ""),
+            "titel": titel,
+            "beschreibung": " ".join(description),
+        }
+
+    def _extract_agenda_items(self):
+        return [self._agenda_entry(top) for top in _XP_TOP(self.root)]
+
+    _STREAM_TAGS = ("tagesordnungspunkt",)
+
+    def _stream_init(self):
+        self.agenda_items = []
+
+    def _stream_handle(self, elem):
+        self.agenda_items.append(self._agenda_entry(elem))
+
+    def to_dict(self):
+        return {"tagesordnungspunkte": self.agenda_items}
+
+
+class SpeakerList(BundestagResource):
+    """All speakers (Redner) that appear in the protocol."""
+
+    def _parse_metadata(self):
+        self.speakers = self._extract_speakers()
+
+    @staticmethod
+    def _speaker_entry(redner, seen_ids):
+        redner_id = redner.get("id", "")
+        if redner_id in seen_ids:
+            return None
+        name_elem = redner.find("./name")
+        if name_elem is None:
+            return None
+        seen_ids.add(redner_id)
+        return _build_speaker(redner_id, name_elem)
+
+    def _extract_speakers(self):
+        speakers = []
+        seen_ids = set()
+        for redner in _XP_REDNER(self.root):
+            speaker = self._speaker_entry(redner, seen_ids)
+            if speaker is not None:
+                speakers.append(speaker)
+        return speakers
+
+    _STREAM_TAGS = ("redner",)
+
+    def _stream_init(self):
+        self.speakers = []
+        self._seen_ids = set()
+
+    def _stream_handle(self, elem):
+        speaker = self._speaker_entry(elem, self._seen_ids)
+        if speaker is not None:
+            self.speakers.append(speaker)
+
+    def to_dict(self):
+        return {"redner": self.speakers}
+
+
+class AttachmentList(BundestagResource):
+    """The attachments (Anlagen) listed in the protocol."""
+
+    def _parse_metadata(self):
+        self.attachments = self._extract_attachments()
+
+    @staticmethod
+    def _attachment_entry(block):
+        titel_elem = _first(_XP_IVZ_BLOCK_TITEL(block))
+        if titel_elem is None or not titel_elem.text:
+            return None
+        if not titel_elem.text.startswith("Anlage"):
+            return None
+        items = []
+        for eintrag in _XP_IVZ_EINTRAG(block):
+            inhalt_elem = _first(_XP_IVZ_EINTRAG_INHALT(eintrag))
+            if inhalt_elem is not None and inhalt_elem.text:
+                items.append(inhalt_elem.text.strip())
+        return {"titel": titel_elem.text.strip(), "eintraege": items}
+
+    def _extract_attachments(self):
+        # The Anlage predicate already ran in libxml2, so every block here
+        # is an attachment.
+        return [TableOfContents._block_entry(block) for block in _XP_ANLAGEN(self.root)]
+
+    _STREAM_TAGS = ("ivz-block",)
+
+    def _stream_init(self):
+        self.attachments = []
+
+    def _stream_handle(self, elem):
+        attachment = self._attachment_entry(elem)
+        if attachment is not None:
+            self.attachments.append(attachment)
+
+    def to_dict(self):
+        return {"anlagen": self.attachments}
+
+
+class Speech(BundestagResource):
+    """All speeches (Reden) of the session, including interjections."""
+
+    @classmethod
+    def from_list(cls, speeches):
+        """A Speech view over an already-extracted speech list.
+
+        Skips parsing entirely; used by the filter endpoints to serialize
+        index hits in the regular response shape.
+        """
+        obj = cls.__new__(cls)
+        obj.speeches = speeches
+        return obj
+
+    def _parse_metadata(self):
+        self.speeches = self._extract_speeches()
+        self._build_indices()
+
+    def _build_indices(self):
+        # Indices for the per-speaker and per-fraction endpoints: one pass
+        # here instead of a linear filter on every request.
+        self._by_speaker = defaultdict(list)
+        self._by_fraction = defaultdict(list)
+        for speech in self.speeches:
+            redner = speech["redner"]
+            if redner.get("id"):
+                self._by_speaker[redner["id"]].append(speech)
+            if redner.get("fraktion"):
+                self._by_fraction[redner["fraktion"]].append(speech)
+        # Lowercased once here so search doesn't re-downcase every speech
+        # on every query. Kept in a parallel list (not on the speech dict)
+        # so it never leaks into serialized responses.
+        self.lower_contents = [speech["inhalt"].lower() for speech in self.speeches]
+        self._token_index = None
+
+    def token_index(self):
+        """Token -> speech-index map for keyword search, built on first use.
+
+        One tokenization pass over all speeches makes subsequent
+        single-word lookups near constant time.
+        """
+        if self._token_index is None:
+            index = defaultdict(set)
+            for i, content in enumerate(self.lower_contents):
+                for token in _NON_WORD.split(content):
+                    if token:
+                        index[token].add(i)
+            self._token_index = index
+        return self._token_index
+
+    @staticmethod
+    def _speech_entry(rede):
+        redner_elem = _first(_XP_REDE_REDNER(rede))
+        redner = {}
+        if redner_elem is not None:
+            name_elem = redner_elem.find("./name")
+            fields = {child.tag: child for child in name_elem} if name_elem is not None else {}
+            redner = {
+                "id": redner_elem.get("id", ""),
+                "vorname": _t(fields.get("vorname")),
+                "nachname": _t(fields.get("nachname")),
+                "fraktion": _t(fields.get("fraktion")),
+            }
+        # Paragraphs and interjections in one C-level iter() walk instead
+        # of two full descendant traversals per rede.
+        paragraphs = []
+        kommentare = []
+        for node in rede.iter("p", "kommentar"):
+            if not node.text:
+                continue
+            if node.tag == "p":
+                if node.get("klasse") == "redner":
+                    continue
+                paragraphs.append(_WHITESPACE.sub(" ", node.text).strip())
+            else:
+                kommentare.append(_WHITESPACE.sub(" ", node.text).strip())
+        return {
+            "id": rede.get("id", ""),
+            "redner": redner,
+            "inhalt": " ".join(paragraphs),
+            "kommentare": kommentare,
+        }
+
+    def _extract_speeches(self):
+        # The stylesheet emits raw text values; only the small result tree
+        # is walked here, with the same cleanup _speech_entry applies on
+        # the streaming path.
+        result = _SPEECH_XSLT(self.root)
+        speeches = []
+        for rede in result.getroot():
+            redner = {}
+            sprecher = rede.find("./sprecher")
+            if sprecher is not None:
+                redner = {
+                    "id": sprecher.get("id", ""),
+                    "vorname": _t(sprecher.find("./vorname")),
+                    "nachname": _t(sprecher.find("./nachname")),
+                    "fraktion": _t(sprecher.find("./fraktion")),
+                }
+            paragraphs = []
+            kommentare = []
+            for node in rede:
+                if not node.text:
+                    continue
+                if node.tag == "t":
+                    paragraphs.append(_WHITESPACE.sub(" ", node.text).strip())
+                elif node.tag == "k":
+                    kommentare.append(_WHITESPACE.sub(" ", node.text).strip())
+            speeches.append({
+                "id": rede.get("id", ""),
+                "redner": redner,
+                "inhalt": " ".join(paragraphs),
+                "kommentare": kommentare,
+            })
+        return speeches
+
+    _STREAM_TAGS = ("rede",)
+
+    def _stream_init(self):
+        self.speeches = []
+
+    def _stream_handle(self, elem):
+        self.speeches.append(self._speech_entry(elem))
+
+    def _stream_finish(self):
+        self._build_indices()
+
+    def to_dict(self):
+        return {"reden": self.speeches}
+
+
+class FullProtocol(BundestagResource):
+    """The complete protocol: metadata, TOC, agenda, speakers and attachments."""
+
+    _SECTION_BUILDERS = {
+        "metadata": lambda root: SessionMetadata._from_root(root).to_dict(),
+        "inhaltsverzeichnis": lambda root: TableOfContents._from_root(root).entries,
+        "tagesordnungspunkte": lambda root: AgendaItem._from_root(root).agenda_items,
+        "redner": lambda root: SpeakerList._from_root(root).speakers,
+        "anlagen": lambda root: AttachmentList._from_root(root).attachments,
+    }
+
+    def _parse_metadata(self):
+        self._cache = {}
+
+    def _section(self, key):
+        # Streamed instances carry all sections already; tree-backed ones
+        # extract each section on first access so consumers that read a
+        # single key don't pay for the other four.
+        sections = getattr(self, "_sections", None)
+        if sections is not None:
+            return sections[key]
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = self._SECTION_BUILDERS[key](self.root)
+        return value
+
+    @property
+    def metadata(self):
+        return self._section("metadata")
+
+    @property
+    def toc(self):
+        return self._section("inhaltsverzeichnis")
+
+    @property
+    def agenda(self):
+        return self._section("tagesordnungspunkte")
+
+    @property
+    def speakers(self):
+        return self._section("redner")
+
+    @property
+    def attachments(self):
+        return self._section("anlagen")
+
+    def to_dict(self):
+        if getattr(self, "_sections", None) is not None:
+            return self._sections
+        # The five sections are derived purely from the (immutable) tree,
+        # so the assembled dict is memoized for repeated to_dict/to_json
+        # calls on the same instance. The extractors are independent and
+        # mostly C-level work, so they run in parallel on the pool.
+        cached = getattr(self, "_cached_dict", None)
+        if cached is None:
+            futures = {key: _EXTRACTOR_POOL.submit(self._section, key)
+                       for key in self._SECTION_BUILDERS}
+            cached = self._cached_dict = {key: future.result()
+                                          for key, future in futures.items()}
+        return cached
+
+    def to_json_bytes(self) -> bytes:
+        cached = getattr(self, "_cached_json", None)
+        if cached is None:
+            cached = self._cached_json = super().to_json_bytes()
+        return cached
+
+    # Streaming builds all five sections in one pass over the document.
+    # Only the container tags are cleared: redner elements sit inside rede
+    # paragraphs that the enclosing Tagesordnungspunkt may still need.
+    _STREAM_TAGS = ("dbtplenarprotokoll", "ivz-block", "tagesordnungspunkt", "redner")
+    _STREAM_CLEAR_TAGS = ("ivz-block", "tagesordnungspunkt")
+
+    def _stream_init(self):
+        self._sections = {
+            "metadata": {},
+            "inhaltsverzeichnis": [],
+            "tagesordnungspunkte": [],
+            "redner": [],
+            "anlagen": [],
+        }
+        self._seen_speaker_ids = set()
+
+    def _stream_handle(self, elem):
+        tag = elem.tag
+        if tag == "ivz-block":
+            self._sections["inhaltsverzeichnis"].append(TableOfContents._block_entry(elem))
+            attachment = AttachmentList._attachment_entry(elem)
+            if attachment is not None:
+                self._sections["anlagen"].append(attachment)
+        elif tag == "tagesordnungspunkt":
+            self._sections["tagesordnungspunkte"].append(AgendaItem._agenda_entry(elem))
+        elif tag == "redner":
+            speaker = SpeakerList._speaker_entry(elem, self._seen_speaker_ids)
+            if speaker is not None:
+                self._sections["redner"].append(speaker)
+        else:
+            metadata = SessionMetadata.__new__(SessionMetadata)
+            metadata._read_attrs(elem)
+            self._sections["metadata"] = metadata.to_dict()
+
+
+def create_resource(resource_type: ResourceType, xml_data, tree=None) -> BundestagResource:
+    """Create the resource view for the given type from raw protocol XML.
+
+    If a pre-parsed `tree` is given, it is reused instead of parsing
+    `xml_data` again.
+    """
+    resource_classes = {
+        ResourceType.FULL_PROTOCOL: FullProtocol,
+        ResourceType.SESSION_METADATA: SessionMetadata,
+        ResourceType.TABLE_OF_CONTENTS: TableOfContents,
+        ResourceType.AGENDA_ITEM: AgendaItem,
+        ResourceType.SPEAKER_LIST: SpeakerList,
+        ResourceType.ATTACHMENT_LIST: AttachmentList,
+        ResourceType.SPEECH: Speech,
+    }
+    return resource_classes[resource_type](xml_data, tree=tree)